@@ -9,10 +9,39 @@ import struct
 import threading
 import time
 import math
+from concurrent.futures import ThreadPoolExecutor, wait
 import numpy as np
 import mediapipe as mp
 from scipy.interpolate import splprep, splev
-from scipy.ndimage import gaussian_filter
+
+# Encoder JPEG GPU (opsional, pip install pynvjpeg). Fallback ke cv2.imencode.
+try:
+    from nvjpeg import NvJpeg
+except ImportError:
+    NvJpeg = None
+
+# Kernel blend Numba (opsional, pip install numba). Fallback ke cv2.blendLinear.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # Signature eksplisit: array '[:]' berlayout 'A' menerima view ROI contiguous
+    # maupun non-contiguous, jadi kernel dikompilasi sekali saat import
+    @njit("void(u1[:, :, :], u1[:], f4[:, :], u1[:, :, :])",
+          parallel=True, fastmath=True, cache=True)
+    def _blend(frame, color, mask, out):
+        """ out = frame * (1 - mask) + color * mask, per pixel (boleh in-place) """
+        h, w = mask.shape
+        for i in prange(h):
+            for j in range(w):
+                a = mask[i, j]
+                inv = 1.0 - a
+                for c in range(3):
+                    out[i, j, c] = np.uint8(frame[i, j, c] * inv + color[c] * a + 0.5)
+else:
+    _blend = None
 
 class UDPWebcamServer:
     def __init__(self, host='127.0.0.1', port=8888, control_port=8889):
@@ -28,31 +57,101 @@ class UDPWebcamServer:
 
         # Optimized settings
         self.max_packet_size = 32768
+        self.header_size = 12
+        # Buffer paket per thread pengirim: header di depan, payload setelahnya
+        self._send_local = threading.local()
+        self._send_pool = None
+        self.send_workers = 4
+        # sendmsg (scatter-gather) hanya tersedia di Unix; Windows memakai sendto
+        self.use_sendmsg = hasattr(socket.socket, "sendmsg")
         self.target_fps = 15
         self.jpeg_quality = 40
         self.frame_width = 640
         self.frame_height = 480
+        self.mask_scale = 4  # Mask blush dibuat pada resolusi 1/mask_scale
+        self.detect_scale = 0.5  # Skala input Mediapipe terhadap frame (aspect ratio tetap)
+
+        # Parameter JPEG dibuat sekali: tanpa optimasi Huffman / progressive
+        # agar jalur encode lebih pendek
+        self.encode_param = [
+            int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality,
+            int(cv2.IMWRITE_JPEG_OPTIMIZE), 0,
+            int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0,
+        ]
+        if hasattr(cv2, "IMWRITE_JPEG_CHROMA_QUALITY"):  # Tidak ada di build OpenCV lama
+            self.encode_param += [int(cv2.IMWRITE_JPEG_CHROMA_QUALITY), 30]
 
         # Performance monitoring
         self.frame_send_time = 1.0 / self.target_fps
 
+        # --- Inisialisasi encoder JPEG (GPU jika tersedia) ---
+        self.gpu_encoder = None
+        if NvJpeg is not None:
+            try:
+                self.gpu_encoder = NvJpeg()
+                print("🚀 Using nvJPEG GPU encoder")
+            except Exception as e:
+                print(f"⚠️ nvJPEG unavailable, falling back to CPU encoder: {e}")
+        # ------------------------------------------------------
+
         # --- Inisialisasi Mediapipe Face Mesh ---
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             max_num_faces=5,  # Support multiple faces
-            refine_landmarks=True,
+            refine_landmarks=False,  # Landmark iris/bibir tidak dipakai untuk area pipi
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5)
         self.mp_drawing = mp.solutions.drawing_utils
+        self.detect_interval = 2  # Jalankan Face Mesh setiap N frame
+        self.frame_counter = 0
+        self.last_landmarks = None  # Landmark terakhir untuk frame yang di-skip
+        # Cache mask per indeks wajah: dipakai ulang jika titik pipi hampir tidak bergerak
+        self._mask_cache = {}
+        self.mask_cache_threshold = 2  # Pergeseran maksimum (px) agar cache dipakai
         # ----------------------------------------
 
+        # --- Indeks landmark pipi (dibuat sekali sebagai array NumPy) ---
+        # Pipi kiri - area blush yang lebih kecil (zygomatic region)
+        self._left_idx = np.array([
+            116, 117, 118, 119, 100,  # Area tulang pipi atas
+            47, 126, 209,  # Area tengah pipi
+            50, 101, 205, 187, # Area bawah pipi (menghindari dagu)
+            # 207, 108, 69,  # Area bawah pipi (menghindari dagu)
+            # 104, 67, 105, 66, 107 # Tambahan untuk memperluas area bawah
+        ], dtype=np.int32)
+        # Pipi kanan - area blush yang lebih kecil (zygomatic region)
+        self._right_idx = np.array([
+            345, 346, 347, 348, 329,  # Area tulang pipi atas
+            277, 355, 429,  # Area tengah pipi
+            280, 330, 425, 411, # Area bawah pipi (menghindari dagu)
+            # 427, 337, 299, # Area bawah pipi (menghindari dagu)
+            # 334, 297, 333, 296, 336 # Tambahan untuk memperluas area bawah
+        ], dtype=np.int32)
+        # ------------------------------------------------------------------
+
         # --- Blush Settings (dapat diubah via control socket) ---
         self.blush_color_rgb = (235, 148, 146)  # Pink natural (RGB format)
+        self.blush_color_bgr = self._to_bgr_array(self.blush_color_rgb)  # Siap pakai untuk OpenCV
         self.blush_intensity = 0.25  # Lebih tipis untuk natural look
         self.blush_blur = 15  # Gaussian blur radius untuk softness
         self.lock = threading.Lock()  # Thread safety untuk update settings
         # ---------------------------------------------------------
 
+        # --- Frame terbaru dari thread capture + blush (single-slot buffer) ---
+        self.latest_frame = None
+        self.latest_frame_id = 0
+        self.taken_frame_id = 0  # ID frame terakhir yang sudah diambil send_frames
+        self.frame_lock = threading.Lock()
+        self.capture_thread = None
+        # ----------------------------------------------------------------------
+
+        if _blend is not None:
+            print("🚀 Using Numba blend kernel")
+
+        # --- Scratch buffer untuk blend (dialokasikan ulang jika ukuran frame berubah) ---
+        self._allocate_scratch(self.frame_height, self.frame_width)
+        # ----------------------------------------------------------------------------------
+
     def initialize_camera(self):
         print("🎥 Initializing optimized camera...")
         self.camera = cv2.VideoCapture(0, cv2.CAP_DSHOW)
@@ -65,11 +164,30 @@ class UDPWebcamServer:
             actual_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
             actual_fps = self.camera.get(cv2.CAP_PROP_FPS)
             print(f"✅ Camera initialized: {actual_width}x{actual_height} @ {actual_fps:.2f} FPS")
+            self._allocate_scratch(actual_height, actual_width)
             return True
         else:
             print("❌ Failed to initialize camera")
             return False
 
+    def _allocate_scratch(self, height, width):
+        """ Alokasi buffer alpha dan warna sekali untuk dipakai ulang tiap frame """
+        self._scratch_alpha = np.zeros((height, width), dtype=np.float32)
+        self._scratch_color_bgr = None  # Warna yang sedang terisi di _scratch_color
+        if _blend is not None:
+            # Kernel Numba tidak butuh inverse alpha maupun gambar warna
+            self._scratch_inv_alpha = None
+            self._scratch_color = None
+        else:
+            self._scratch_inv_alpha = np.zeros((height, width), dtype=np.float32)
+            self._scratch_color = np.empty((height, width, 3), dtype=np.uint8)
+
+    @staticmethod
+    def _to_bgr_array(color_rgb):
+        """ Convert RGB tuple ke array BGR uint8 untuk OpenCV """
+        r, g, b = color_rgb
+        return np.clip([b, g, r], 0, 255).astype(np.uint8)
+
     def listen_for_clients(self):
         """ Listens for incoming client messages """
         print(f"👂 Listening for clients on {self.host}:{self.port}...")
@@ -107,8 +225,10 @@ class UDPWebcamServer:
                     try:
                         rgb_str = command.split(":")[1]
                         r, g, b = map(int, rgb_str.split(","))
+                        color_bgr = self._to_bgr_array((r, g, b))
                         with self.lock:
                             self.blush_color_rgb = (r, g, b)
+                            self.blush_color_bgr = color_bgr
                         print(f"🎨 Blush color updated to RGB({r}, {g}, {b})")
                         self.control_socket.sendto(b"COLOR_OK", addr)
                     except Exception as e:
@@ -151,165 +271,299 @@ class UDPWebcamServer:
         """
         Mendapatkan titik-titik kontur pipi yang lebih presisi
         """
-        if is_left:
-            # Pipi kiri - area blush yang lebih kecil (zygomatic region)
-            indices = [
-                116, 117, 118, 119, 100,  # Area tulang pipi atas
-                47, 126, 209,  # Area tengah pipi
-                50, 101, 205, 187, # Area bawah pipi (menghindari dagu)
-                # 207, 108, 69,  # Area bawah pipi (menghindari dagu)
-                # 104, 67, 105, 66, 107 # Tambahan untuk memperluas area bawah
-            ]
+        indices = self._left_idx if is_left else self._right_idx
+
+        lm = face_landmarks.landmark
+        if indices.max() >= len(lm):
+            indices = indices[indices < len(lm)]
+
+        coords = np.array([(lm[i].x, lm[i].y) for i in indices], dtype=np.float32).reshape(-1, 2)
+        coords *= (w, h)
+        return coords.astype(np.int32)
+
+    def create_smooth_blush_mask_pair(self, frame_shape, left_points, right_points, blur_radius, scale=4, roi=None):
+        """
+        Membuat satu mask blush yang smooth untuk kedua pipi sekaligus.
+        Tiap pipi diisi ke channel sendiri lalu kedua channel di-blur dengan
+        satu panggilan GaussianBlur; tiap pipi tetap dinormalisasi ke puncaknya
+        sendiri sehingga pipi yang lebih jauh/kecil tidak tampak lebih pudar.
+        Mask dibuat dan di-blur pada resolusi 1/scale lalu di-upsample,
+        karena hasilnya sudah smooth sehingga detail tidak hilang.
+        Jika roi=(x, y, w, h) diberikan, mask hanya sebesar ROI tersebut.
+        """
+        if roi is not None:
+            x, y, w, h = roi
+            offset = np.array([x, y], dtype=np.int32)
         else:
-            # Pipi kanan - area blush yang lebih kecil (zygomatic region)
-            indices = [
-                345, 346, 347, 348, 329,  # Area tulang pipi atas
-                277, 355, 429,  # Area tengah pipi
-                280, 330, 425, 411, # Area bawah pipi (menghindari dagu)
-                # 427, 337, 299, # Area bawah pipi (menghindari dagu)
-                # 334, 297, 333, 296, 336 # Tambahan untuk memperluas area bawah
-            ]
+            h, w = frame_shape[:2]
+            offset = np.zeros(2, dtype=np.int32)
+
+        small_h, small_w = max(1, h // scale), max(1, w // scale)
+        left_mask = np.zeros((small_h, small_w), dtype=np.uint8)
+        right_mask = np.zeros((small_h, small_w), dtype=np.uint8)
+
+        # Buat convex hull tiap pipi untuk area blush (koordinat skala kecil)
+        filled = False
+        for points, cheek_mask in ((left_points, left_mask), (right_points, right_mask)):
+            if len(points) < 3:
+                continue
+            hull = cv2.convexHull((points - offset) // scale)
+            cv2.fillConvexPoly(cheek_mask, hull, 255)
+            filled = True
 
-        points = []
-        for idx in indices:
-            if idx < len(face_landmarks.landmark):
-                lm = face_landmarks.landmark[idx]
-                points.append((int(lm.x * w), int(lm.y * h)))
+        if not filled:
+            return np.zeros((h, w), dtype=np.float32)
 
-        return np.array(points, dtype=np.int32)
+        # Apply gaussian blur untuk smooth transition (OpenCV SIMD path, uint8),
+        # satu panggilan untuk kedua pipi
+        sigma = blur_radius / scale
+        ksize = 2 * math.ceil(3 * sigma) + 1  # Kernel mencakup 3 sigma penuh
+        mask = cv2.GaussianBlur(cv2.merge([left_mask, right_mask]), (ksize, ksize), sigma)
 
-    def create_smooth_blush_mask(self, frame_shape, points, blur_radius):
+        # Normalize tiap pipi ke puncaknya sendiri, lalu gabungkan (resolusi kecil)
+        mask_max = mask.reshape(-1, 2).max(axis=0).astype(np.float32)
+        gains = np.divide(1.0, mask_max, out=np.zeros(2, dtype=np.float32), where=mask_max > 0)
+        mask = (mask.astype(np.float32) * gains).max(axis=2)
+
+        # Upsample kembali ke resolusi frame/ROI
+        return cv2.resize(mask, (w, h), interpolation=cv2.INTER_LINEAR)
+
+    def _is_mask_cache_valid(self, cached, left_points, right_points, blur):
         """
-        Membuat mask blush yang smooth dengan gradient natural
+        Cek apakah mask cache masih bisa dipakai (blur sama, titik pipi hampir tidak bergerak)
         """
-        h, w = frame_shape[:2]
-        mask = np.zeros((h, w), dtype=np.float32)
-        
-        if len(points) < 3:
-            return mask
-        
-        # Buat convex hull dari points untuk area blush
-        hull = cv2.convexHull(points)
-        cv2.fillConvexPoly(mask, hull, 1.0)
-        
-        # Apply gaussian blur untuk smooth transition
-        mask = gaussian_filter(mask, sigma=blur_radius)
-        
-        # Normalize mask
-        if mask.max() > 0:
-            mask = mask / mask.max()
-        
-        return mask
+        cached_left, cached_right, cached_blur, _, _ = cached
+        if cached_blur != blur:
+            return False
+        if cached_left.shape != left_points.shape or cached_right.shape != right_points.shape:
+            return False
+        threshold = self.mask_cache_threshold
+        return (np.abs(left_points - cached_left).max(initial=0) < threshold and
+                np.abs(right_points - cached_right).max(initial=0) < threshold)
 
     def apply_blush(self, frame):
         """
-        Aplikasi blush yang natural dengan deteksi multi-wajah
+        Aplikasi blush yang natural dengan deteksi multi-wajah.
+        Blush di-blend langsung (in-place) ke frame uint8 yang diberikan.
         """
-        output_frame = frame.copy().astype(np.float32)
+        # Face Mesh hanya dijalankan setiap detect_interval frame; di antaranya
+        # landmark terakhir dipakai ulang karena gerakan antar frame kecil.
+        if self.frame_counter % self.detect_interval == 0:
+            # Downscale lalu konversi BGR ke RGB untuk Mediapipe. Landmark yang
+            # dihasilkan ternormalisasi, jadi tetap bisa dipakai dengan w, h asli.
+            small_frame = cv2.resize(frame, None, fx=self.detect_scale, fy=self.detect_scale,
+                                     interpolation=cv2.INTER_AREA)
+            rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+            rgb_frame.flags.writeable = False
+            results = self.face_mesh.process(rgb_frame)
+            rgb_frame.flags.writeable = True
+            self.last_landmarks = results.multi_face_landmarks
+        self.frame_counter += 1
+
+        multi_face_landmarks = self.last_landmarks
+
+        # Tidak ada wajah: kembalikan frame asli tanpa alokasi apa pun
+        if not multi_face_landmarks:
+            self._mask_cache.clear()
+            return frame
+
+        # Buang cache untuk wajah yang sudah tidak terdeteksi
+        for face_idx in list(self._mask_cache):
+            if face_idx >= len(multi_face_landmarks):
+                del self._mask_cache[face_idx]
+
+        h, w, _ = frame.shape
+        if self._scratch_alpha.shape != (h, w):
+            self._allocate_scratch(h, w)
+        
+        # Get current settings with thread safety
+        with self.lock:
+            color_bgr = self.blush_color_bgr
+            intensity = self.blush_intensity
+            blur = self.blush_blur
+
+        # Isi ulang buffer warna hanya jika warna blush berubah
+        if _blend is None and self._scratch_color_bgr is not color_bgr:
+            self._scratch_color[:, :] = color_bgr
+            self._scratch_color_bgr = color_bgr
         
-        # Konversi BGR ke RGB untuk Mediapipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        rgb_frame.flags.writeable = False
-        results = self.face_mesh.process(rgb_frame)
-        rgb_frame.flags.writeable = True
-
-        if results.multi_face_landmarks:
-            h, w, _ = frame.shape
+        # Process each detected face
+        for face_idx, face_landmarks in enumerate(multi_face_landmarks):
             
-            # Get current settings with thread safety
-            with self.lock:
-                color_rgb = self.blush_color_rgb
-                intensity = self.blush_intensity
-                blur = self.blush_blur
+            # Get cheek contour points
+            left_cheek_points = self.get_cheek_contour_points(face_landmarks, w, h, is_left=True)
+            right_cheek_points = self.get_cheek_contour_points(face_landmarks, w, h, is_left=False)
             
-            # Convert RGB to BGR for OpenCV
-            color_bgr = (color_rgb[2], color_rgb[1], color_rgb[0])
+            if len(left_cheek_points) < 3 and len(right_cheek_points) < 3:
+                continue
+
+            cached = self._mask_cache.get(face_idx)
+            if cached is not None and self._is_mask_cache_valid(cached, left_cheek_points, right_cheek_points, blur):
+                # Pipi hampir diam: pakai ulang mask dan ROI sebelumnya
+                _, _, _, roi, combined_mask = cached
+                x0, y0, roi_w, roi_h = roi
+                x1, y1 = x0 + roi_w, y0 + roi_h
+            else:
+                # Bounding box kedua pipi, diperluas 3 sigma agar blur tidak terpotong
+                x, y, bw, bh = cv2.boundingRect(np.vstack([left_cheek_points, right_cheek_points]))
+                pad = 3 * blur
+                x0, y0 = max(0, x - pad), max(0, y - pad)
+                x1, y1 = min(w, x + bw + pad), min(h, y + bh + pad)
+                if x1 <= x0 or y1 <= y0:
+                    continue
+                roi = (x0, y0, x1 - x0, y1 - y0)
+
+                # Create one smooth mask for both cheeks (hanya di dalam ROI)
+                combined_mask = self.create_smooth_blush_mask_pair(
+                    (h, w), left_cheek_points, right_cheek_points, blur, self.mask_scale, roi)
+                self._mask_cache[face_idx] = (left_cheek_points, right_cheek_points, blur, roi, combined_mask)
             
-            # Process each detected face
-            for face_idx, face_landmarks in enumerate(results.multi_face_landmarks):
-                
-                # Get cheek contour points
-                left_cheek_points = self.get_cheek_contour_points(face_landmarks, w, h, is_left=True)
-                right_cheek_points = self.get_cheek_contour_points(face_landmarks, w, h, is_left=False)
-                
-                # Create smooth masks for both cheeks
-                left_mask = self.create_smooth_blush_mask((h, w), left_cheek_points, blur)
-                right_mask = self.create_smooth_blush_mask((h, w), right_cheek_points, blur)
-                
-                # Combine masks
-                combined_mask = np.maximum(left_mask, right_mask)
-                
-                # Apply mask intensity
-                combined_mask = combined_mask * intensity
-                
-                # Create color overlay
-                color_overlay = np.zeros_like(output_frame)
-                color_overlay[:, :] = color_bgr
-                
-                # Blend dengan frame menggunakan mask
-                for c in range(3):
-                    output_frame[:, :, c] = (
-                        output_frame[:, :, c] * (1 - combined_mask) +
-                        color_overlay[:, :, c] * combined_mask
-                    )
+            # Apply mask intensity (ke scratch buffer, tanpa alokasi baru)
+            alpha = self._scratch_alpha[y0:y1, x0:x1]
+            np.multiply(combined_mask, np.float32(intensity), out=alpha)
+            
+            roi_frame = frame[y0:y1, x0:x1]
+            if _blend is not None:
+                # Kernel Numba: blend in-place langsung ke ROI frame
+                _blend(roi_frame, color_bgr, alpha, roi_frame)
+            else:
+                # Blend langsung di uint8 (tanpa konversi frame ke float32), hanya di ROI
+                inv_alpha = self._scratch_inv_alpha[y0:y1, x0:x1]
+                np.subtract(np.float32(1.0), alpha, out=inv_alpha)
+                color_img = self._scratch_color[y0:y1, x0:x1]
+                roi_frame[:] = cv2.blendLinear(color_img, roi_frame, alpha, inv_alpha)
         
-        return output_frame.astype(np.uint8)
+        return frame
+
+    def encode_frame(self, frame):
+        """
+        Encode frame ke JPEG bytes, memakai nvJPEG jika tersedia
+        """
+        if self.gpu_encoder is not None:
+            try:
+                return self.gpu_encoder.encode(frame, self.jpeg_quality)
+            except Exception as e:
+                print(f"⚠️ nvJPEG encoding failed, falling back to CPU encoder: {e}")
+                self.gpu_encoder = None
+
+        result, encoded_frame = cv2.imencode('.jpg', frame, self.encode_param)
+        if not result:
+            return None
+        return encoded_frame.tobytes()
+
+    def _capture_and_process_loop(self):
+        """ Captures frames and applies blush, keeping only the latest result """
+        while self.running:
+            try:
+                ret, frame = self.camera.read()
+                if not ret:
+                    print("⚠️ Dropped frame")
+                    time.sleep(0.01)
+                    continue
+
+                # Slot masih berisi frame yang belum diambil send_frames: buang
+                # frame kamera ini (tetap dibaca agar buffer kamera tidak basi)
+                # supaya Face Mesh + blend tidak jalan lebih cepat dari target_fps
+                with self.frame_lock:
+                    slot_full = self.latest_frame_id != self.taken_frame_id
+                if slot_full:
+                    continue
+
+                # Aplikasikan Blush On
+                frame_with_blush = self.apply_blush(frame)
+
+                with self.frame_lock:
+                    self.latest_frame = frame_with_blush
+                    self.latest_frame_id += 1
+
+            except Exception as e:
+                # Hentikan server agar send_frames tidak menunggu frame selamanya
+                if self.running:
+                    print(f"❌ Capture/processing error: {e}")
+                    self.running = False
+                break
+
+    def _get_packet_buffer(self):
+        """ Buffer paket milik thread ini, dialokasikan sekali per thread """
+        pkt_mv = getattr(self._send_local, "pkt_mv", None)
+        if pkt_mv is None:
+            pkt_mv = memoryview(bytearray(self.max_packet_size))
+            self._send_local.pkt_mv = pkt_mv
+        return pkt_mv
+
+    def _send_all_packets(self, client_addr, frame_view, sequence_number, total_packets, payload_size):
+        """ Sends every packet of one encoded frame to a single client """
+        header_size = self.header_size
+        frame_size = len(frame_view)
+        pkt_mv = self._get_packet_buffer()
+        try:
+            for packet_index in range(total_packets):
+                start_pos = packet_index * payload_size
+                end_pos = min(start_pos + payload_size, frame_size)
+
+                struct.pack_into("!III", pkt_mv, 0, sequence_number, total_packets, packet_index)
+                payload = frame_view[start_pos:end_pos]
+
+                if self.use_sendmsg:
+                    # Header + payload dikirim tanpa digabung terlebih dulu
+                    self.server_socket.sendmsg([pkt_mv[:header_size], payload], [], 0, client_addr)
+                else:
+                    packet_end = header_size + len(payload)
+                    pkt_mv[header_size:packet_end] = payload
+                    self.server_socket.sendto(pkt_mv[:packet_end], client_addr)
+
+        except socket.error as se:
+            print(f"❌ Socket error sending to {client_addr}: {se}")
+            self.clients.discard(client_addr)
+        except Exception as e:
+            print(f"❌ Unexpected error sending to {client_addr}: {e}")
+            self.clients.discard(client_addr)
 
     def send_frames(self):
-        """ Captures frames, applies blush, encodes, packets, and sends them """
+        """ Encodes the latest processed frame, packets, and sends it """
         print("🚀 Starting frame broadcast...")
+        last_sent_id = 0
 
         while self.running:
             start_capture_time = time.time()
 
-            ret, frame = self.camera.read()
-            if not ret:
-                print("⚠️ Dropped frame")
-                time.sleep(0.01)
-                continue
+            with self.frame_lock:
+                frame_with_blush = self.latest_frame
+                frame_id = self.latest_frame_id
+                self.taken_frame_id = frame_id
 
-            # Aplikasikan Blush On
-            frame_with_blush = self.apply_blush(frame)
+            if frame_with_blush is None or frame_id == last_sent_id:
+                # Belum ada frame baru dari thread capture
+                time.sleep(0.005)
+                continue
+            last_sent_id = frame_id
 
             # Encode frame ke JPEG
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
-            result, encoded_frame = cv2.imencode('.jpg', frame_with_blush, encode_param)
+            frame_data = self.encode_frame(frame_with_blush)
 
-            if not result:
+            if frame_data is None:
                 print("❌ JPEG encoding failed")
                 continue
 
-            frame_data = encoded_frame.tobytes()
+            frame_view = memoryview(frame_data)  # Slice tanpa copy
             frame_size = len(frame_data)
             self.sequence_number += 1
 
             # Packetization
-            header_size = 12
-            payload_size = self.max_packet_size - header_size
+            payload_size = self.max_packet_size - self.header_size
             total_packets = math.ceil(frame_size / payload_size)
 
-            # Send to all clients
+            # Send to all clients (paralel, JPEG yang sama untuk semua client)
             current_clients = self.clients.copy()
-            for client_addr in current_clients:
-                try:
-                    for packet_index in range(total_packets):
-                        start_pos = packet_index * payload_size
-                        end_pos = min(start_pos + payload_size, frame_size)
-
-                        header = struct.pack("!III", self.sequence_number, total_packets, packet_index)
-                        udp_packet = header + frame_data[start_pos:end_pos]
-
-                        self.server_socket.sendto(udp_packet, client_addr)
-
-                    if self.sequence_number % (self.target_fps * 2) == 1:
-                        print(f"📤 Frame {self.sequence_number} ({frame_size // 1024} KB) → {len(current_clients)} clients")
+            futures = [
+                self._send_pool.submit(self._send_all_packets, client_addr, frame_view,
+                                       self.sequence_number, total_packets, payload_size)
+                for client_addr in current_clients
+            ]
+            wait(futures)
 
-                except socket.error as se:
-                    print(f"❌ Socket error sending to {client_addr}: {se}")
-                    self.clients.discard(client_addr)
-                except Exception as e:
-                    print(f"❌ Unexpected error sending to {client_addr}: {e}")
-                    self.clients.discard(client_addr)
+            if current_clients and self.sequence_number % (self.target_fps * 2) == 1:
+                print(f"📤 Frame {self.sequence_number} ({frame_size // 1024} KB) → {len(current_clients)} clients")
 
             # Frame rate control
             elapsed_time = time.time() - start_capture_time
@@ -340,6 +594,9 @@ class UDPWebcamServer:
 
         self.running = True
         self.sequence_number = 0
+        self.latest_frame = None
+        self.latest_frame_id = 0
+        self.taken_frame_id = 0
 
         # Start listener threads
         self.listener_thread = threading.Thread(target=self.listen_for_clients, daemon=True)
@@ -348,6 +605,13 @@ class UDPWebcamServer:
         self.control_thread = threading.Thread(target=self.listen_for_controls, daemon=True)
         self.control_thread.start()
 
+        # Thread pool untuk mengirim frame ke banyak client secara paralel
+        self._send_pool = ThreadPoolExecutor(max_workers=self.send_workers)
+
+        # Start capture + blush thread (producer untuk send_frames)
+        self.capture_thread = threading.Thread(target=self._capture_and_process_loop, daemon=True)
+        self.capture_thread.start()
+
         # Start frame sending
         try:
             self.send_frames()
@@ -361,6 +625,15 @@ class UDPWebcamServer:
         self.running = False
         time.sleep(0.1)
 
+        # Tunggu thread capture selesai sebelum kamera dilepas
+        if self.capture_thread and self.capture_thread is not threading.current_thread():
+            self.capture_thread.join(timeout=1.0)
+            self.capture_thread = None
+
+        if self._send_pool:
+            self._send_pool.shutdown(wait=True)
+            self._send_pool = None
+
         if self.server_socket:
             self.server_socket.close()
             self.server_socket = None
@@ -376,6 +649,7 @@ class UDPWebcamServer:
 if __name__ == "__main__":
     print("=== UDP Webcam Server with Enhanced Blush On ===")
     print("📝 Install dependencies: pip install opencv-python mediapipe scipy numpy")
+    print("⚡ Optional accelerators: pip install pynvjpeg (GPU JPEG encode), numba (blend kernel)")
     server = UDPWebcamServer()
     try:
         server.start_server()